@@ -28,7 +28,7 @@ from .crud import (create_admin, create_notification_reminder,  # noqa
                    get_admins, get_jwt_secret_key, get_notification_reminder,
                    get_or_create_inbound, get_system_usage,
                    get_tls_certificate, get_user, get_user_by_id, get_users,
-                   get_users_count, remove_admin, remove_user, revoke_user_sub,
+                   get_users_count, get_user_counts_by_status, remove_admin, remove_user, revoke_user_sub,
                    set_owner, update_admin, update_user, update_user_status, reset_user_by_next,
                    update_user_sub, start_user_expire, get_admin_by_id,
                    get_admin_by_telegram_id)
@@ -41,6 +41,7 @@ __all__ = [
     "get_user_by_id",
     "get_users",
     "get_users_count",
+    "get_user_counts_by_status",
     "create_user",
     "remove_user",
     "update_user",
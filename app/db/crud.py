@@ -4,7 +4,7 @@ Functions for managing proxy hosts, users, user templates, nodes, and administra
 
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Dict, List, Optional, Tuple, Union
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
 from sqlalchemy import and_, delete, func, or_
 from sqlalchemy.orm import Query, Session, joinedload, subqueryload
@@ -95,6 +95,37 @@ def get_hosts(db: Session, inbound_tag: str) -> List[ProxyHost]:
     return inbound.hosts
 
 
+def get_hosts_grouped(db: Session, inbound_tags: Iterable[str]) -> Dict[str, List[ProxyHost]]:
+    """
+    Retrieves hosts for several inbound tags with a single query.
+
+    Args:
+        db (Session): Database session.
+        inbound_tags (Iterable[str]): The tags of the inbounds.
+
+    Returns:
+        Dict[str, List[ProxyHost]]: Hosts grouped by inbound tag.
+    """
+    inbound_tags = set(inbound_tags)
+    existing_tags = {
+        tag for tag, in db.query(ProxyInbound.tag).filter(ProxyInbound.tag.in_(inbound_tags))
+    }
+    for inbound_tag in inbound_tags - existing_tags:
+        get_or_create_inbound(db, inbound_tag)
+
+    hosts = (
+        db.query(ProxyHost)
+        .filter(ProxyHost.inbound_tag.in_(inbound_tags))
+        .order_by(ProxyHost.id)
+        .all()
+    )
+
+    grouped = {tag: [] for tag in inbound_tags}
+    for host in hosts:
+        grouped[host.inbound_tag].append(host)
+    return grouped
+
+
 def add_host(db: Session, inbound_tag: str, host: ProxyHostModify) -> List[ProxyHost]:
     """
     Adds a new host to a proxy inbound.
@@ -358,6 +389,23 @@ def get_users_count(db: Session, status: UserStatus = None, admin: Admin = None)
     return query.count()
 
 
+def get_user_counts_by_status(db: Session, admin: Admin = None) -> Dict[UserStatus, int]:
+    """
+    Retrieves the count of users grouped by status in a single query.
+
+    Args:
+        db (Session): Database session.
+        admin (Admin, optional): Admin to filter users by.
+
+    Returns:
+        Dict[UserStatus, int]: Count of users for each status that has any users.
+    """
+    query = db.query(User.status, func.count(User.id))
+    if admin:
+        query = query.filter(User.admin == admin)
+    return dict(query.group_by(User.status).all())
+
+
 def create_user(db: Session, user: UserCreate, admin: Admin = None) -> User:
     """
     Creates a new user with provided details.
@@ -265,7 +265,7 @@ class ProxyHost(Base):
         server_default=ProxyHostSecurity.none.name
     )
 
-    inbound_tag = Column(String(256), ForeignKey("inbounds.tag"), nullable=False)
+    inbound_tag = Column(String(256), ForeignKey("inbounds.tag"), nullable=False, index=True)
     inbound = relationship("ProxyInbound", back_populates="hosts")
     allowinsecure = Column(Boolean, nullable=True)
     is_disabled = Column(Boolean, nullable=True, default=False)
@@ -1,9 +1,12 @@
-from typing import Dict, List, Union
+import asyncio
+import time
+from functools import partial
+from typing import Dict, List, Tuple, Union
 
 from fastapi import APIRouter, Depends, HTTPException
 
 from app import __version__, xray
-from app.db import Session, crud, get_db
+from app.db import GetDB, Session, crud, get_db
 from app.models.admin import Admin
 from app.models.proxy import ProxyHost, ProxyInbound, ProxyTypes
 from app.models.system import SystemStats
@@ -18,33 +21,62 @@ if SINGBOX_ENABLED:
 router = APIRouter(tags=["System"], prefix="/api", responses={401: responses._401})
 
 
+# Seconds user counts are reused between /system requests of the same admin,
+# so dashboards polling the endpoint don't hit the database every time
+USER_STATS_CACHE_TTL = 3
+USER_STATS_CACHE_SIZE = 512
+
+_user_stats_cache: Dict[Tuple[str, bool], Tuple[float, Dict[UserStatus, int], int]] = {}
+
+
+def _cache_user_stats(key: Tuple[str, bool], counts: Dict[UserStatus, int], online_users: int):
+    now = time.monotonic()
+    if len(_user_stats_cache) >= USER_STATS_CACHE_SIZE:
+        for expired in [k for k, v in _user_stats_cache.items() if v[0] <= now]:
+            del _user_stats_cache[expired]
+        if len(_user_stats_cache) >= USER_STATS_CACHE_SIZE:
+            _user_stats_cache.clear()
+    _user_stats_cache[key] = (now + USER_STATS_CACHE_TTL, counts, online_users)
+
+
+def _run_with_db(func, *args, **kwargs):
+    """Run a crud function with its own short-lived database session."""
+    with GetDB() as db:
+        return func(db, *args, **kwargs)
+
+
 @router.get("/system", response_model=SystemStats)
-def get_system_stats(
+async def get_system_stats(
     db: Session = Depends(get_db), admin: Admin = Depends(Admin.get_current)
 ):
     """Fetch system stats including memory, CPU, and user metrics."""
     mem = memory_usage()
     cpu = cpu_usage()
-    system = crud.get_system_usage(db)
-    dbadmin: Union[Admin, None] = crud.get_admin(db, admin.username)
+    loop = asyncio.get_running_loop()
+    system = await loop.run_in_executor(None, crud.get_system_usage, db)
+
+    cache_key = (admin.username, admin.is_sudo)
+    cached = _user_stats_cache.get(cache_key)
+    if cached and cached[0] > time.monotonic():
+        _, counts, online_users = cached
+    else:
+        dbadmin: Union[Admin, None] = await loop.run_in_executor(
+            None, crud.get_admin, db, admin.username
+        )
+        owner = dbadmin if not admin.is_sudo else None
+
+        # Status counts and online users are independent queries, so they are
+        # issued concurrently over separate pool connections
+        counts, online_users = await asyncio.gather(
+            loop.run_in_executor(
+                None, partial(_run_with_db, crud.get_user_counts_by_status, admin=owner)
+            ),
+            loop.run_in_executor(
+                None, partial(_run_with_db, crud.count_online_users, hours=24)
+            ),
+        )
+        _cache_user_stats(cache_key, counts, online_users)
 
-    total_user = crud.get_users_count(db, admin=dbadmin if not admin.is_sudo else None)
-    users_active = crud.get_users_count(
-        db, status=UserStatus.active, admin=dbadmin if not admin.is_sudo else None
-    )
-    users_disabled = crud.get_users_count(
-        db, status=UserStatus.disabled, admin=dbadmin if not admin.is_sudo else None
-    )
-    users_on_hold = crud.get_users_count(
-        db, status=UserStatus.on_hold, admin=dbadmin if not admin.is_sudo else None
-    )
-    users_expired = crud.get_users_count(
-        db, status=UserStatus.expired, admin=dbadmin if not admin.is_sudo else None
-    )
-    users_limited = crud.get_users_count(
-        db, status=UserStatus.limited, admin=dbadmin if not admin.is_sudo else None
-    )
-    online_users = crud.count_online_users(db, 24)
     realtime_bandwidth_stats = realtime_bandwidth()
 
     return SystemStats(
@@ -53,13 +85,13 @@ def get_system_stats(
         mem_used=mem.used,
         cpu_cores=cpu.cores,
         cpu_usage=cpu.percent,
-        total_user=total_user,
+        total_user=sum(counts.values()),
         online_users=online_users,
-        users_active=users_active,
-        users_disabled=users_disabled,
-        users_expired=users_expired,
-        users_limited=users_limited,
-        users_on_hold=users_on_hold,
+        users_active=counts.get(UserStatus.active, 0),
+        users_disabled=counts.get(UserStatus.disabled, 0),
+        users_expired=counts.get(UserStatus.expired, 0),
+        users_limited=counts.get(UserStatus.limited, 0),
+        users_on_hold=counts.get(UserStatus.on_hold, 0),
         incoming_bandwidth=system.uplink,
         outgoing_bandwidth=system.downlink,
         incoming_bandwidth_speed=realtime_bandwidth_stats.incoming_bytes,
@@ -84,10 +116,9 @@ def get_inbounds(admin: Admin = Depends(Admin.get_current)):
 
 def _get_all_inbound_tags():
     """Get all inbound tags from both Xray and Sing-box."""
-    tags = set(xray.config.inbounds_by_tag.keys())
     if SINGBOX_ENABLED and singbox.config:
-        tags.update(singbox.config.inbounds_by_tag.keys())
-    return tags
+        return xray.config.inbound_tags | singbox.config.inbound_tags
+    return xray.config.inbound_tags
 
 
 @router.get(
@@ -97,9 +128,7 @@ def get_hosts(
     db: Session = Depends(get_db), admin: Admin = Depends(Admin.check_sudo_admin)
 ):
     """Get a list of proxy hosts grouped by inbound tag."""
-    all_tags = _get_all_inbound_tags()
-    hosts = {tag: crud.get_hosts(db, tag) for tag in all_tags}
-    return hosts
+    return crud.get_hosts_grouped(db, _get_all_inbound_tags())
 
 
 @router.put(
@@ -125,4 +154,4 @@ def modify_hosts(
     if SINGBOX_ENABLED and singbox.hosts:
         singbox.hosts.update()
 
-    return {tag: crud.get_hosts(db, tag) for tag in all_tags}
+    return crud.get_hosts_grouped(db, all_tags)
@@ -1,4 +1,4 @@
-from typing import TYPE_CHECKING, Sequence
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 from app.models.proxy import ProxyHostSecurity
 from app.utils.store import DictStorage
@@ -22,23 +22,26 @@ if SINGBOX_ENABLED:
     )
     config = SingBoxConfig(SINGBOX_JSON)
 
+    def _split_csv(value: Optional[str]) -> List[str]:
+        return [i.strip() for i in value.split(',')] if value else []
+
     @DictStorage
     def hosts(storage: dict):
         from app.db import GetDB, crud
 
         storage.clear()
         with GetDB() as db:
-            for inbound_tag in config.inbounds_by_tag:
-                inbound_hosts: Sequence[ProxyHost] = crud.get_hosts(db, inbound_tag)
+            hosts_by_tag: Dict[str, List[ProxyHost]] = crud.get_hosts_grouped(db, config.inbounds_by_tag)
 
+            for inbound_tag in config.inbounds_by_tag:
                 storage[inbound_tag] = [
                     {
                         "remark": host.remark,
-                        "address": [i.strip() for i in host.address.split(',')] if host.address else [],
+                        "address": _split_csv(host.address),
                         "port": host.port,
                         "path": host.path if host.path else None,
-                        "sni": [i.strip() for i in host.sni.split(',')] if host.sni else [],
-                        "host": [i.strip() for i in host.host.split(',')] if host.host else [],
+                        "sni": _split_csv(host.sni),
+                        "host": _split_csv(host.host),
                         "alpn": host.alpn.value,
                         "fingerprint": host.fingerprint.value,
                         "tls": None
@@ -50,7 +53,7 @@ if SINGBOX_ENABLED:
                         "noise_setting": host.noise_setting,
                         "random_user_agent": host.random_user_agent,
                         "use_sni_as_host": host.use_sni_as_host,
-                    } for host in inbound_hosts if not host.is_disabled
+                    } for host in hosts_by_tag[inbound_tag] if not host.is_disabled
                 ]
 else:
     core = None
@@ -1,5 +1,6 @@
 import json
 import re
+from collections import defaultdict
 from copy import deepcopy
 from pathlib import Path
 from typing import Dict, List, Optional, Union
@@ -8,6 +9,19 @@ import commentjson
 
 from app.models.proxy import ProxyTypes
 
+PROTOCOL_PROXY_TYPES = {
+    "hysteria2": ProxyTypes.Hysteria2,
+    "tuic": ProxyTypes.TUIC,
+    "wireguard": ProxyTypes.WireGuard,
+}
+
+# Default network type based on protocol
+PROTOCOL_NETWORKS = {
+    "hysteria2": "hysteria2",
+    "tuic": "quic",
+    "wireguard": "wireguard",
+}
+
 
 class SingBoxConfig(dict):
     """
@@ -29,14 +43,19 @@ class SingBoxConfig(dict):
             else:
                 with open(config, "r") as f:
                     config = commentjson.load(f)
+        elif inbounds_by_tag is None or inbounds_by_protocol is None:
+            # Take a private copy of caller supplied dicts; copy() passes an
+            # already copied config along with its resolved inbounds
+            config = json.loads(json.dumps(config))
 
-        super().__init__(deepcopy(config))
+        super().__init__(config)
 
         if inbounds_by_tag is None or inbounds_by_protocol is None:
             inbounds_by_tag, inbounds_by_protocol = self._resolve_inbounds()
 
         self.inbounds_by_tag = inbounds_by_tag
         self.inbounds_by_protocol = inbounds_by_protocol
+        self.inbound_tags = frozenset(inbounds_by_tag)
 
     def _resolve_inbounds(self):
         """Parse inbounds and group them by tag and protocol."""
@@ -50,19 +69,12 @@ class SingBoxConfig(dict):
             if not tag or protocol not in self.SUPPORTED_PROTOCOLS:
                 continue
 
-            # Set default network type based on protocol
-            network_map = {
-                "hysteria2": "hysteria2",
-                "tuic": "quic",
-                "wireguard": "wireguard",
-            }
-
             settings = {
                 "tag": tag,
                 "protocol": protocol,
                 "port": inbound.get("listen_port") or inbound.get("port"),
                 "listen": inbound.get("listen", "::"),
-                "network": network_map.get(protocol, "tcp"),
+                "network": PROTOCOL_NETWORKS.get(protocol, "tcp"),
                 "host": [],  # Required for subscription generation
                 "path": "",  # Required for subscription generation
                 "header_type": "",  # Required for subscription generation
@@ -89,12 +101,7 @@ class SingBoxConfig(dict):
 
     def _protocol_to_proxy_type(self, protocol: str) -> Optional[ProxyTypes]:
         """Map sing-box protocol name to ProxyTypes enum."""
-        mapping = {
-            "hysteria2": ProxyTypes.Hysteria2,
-            "tuic": ProxyTypes.TUIC,
-            "wireguard": ProxyTypes.WireGuard,
-        }
-        return mapping.get(protocol)
+        return PROTOCOL_PROXY_TYPES.get(protocol)
 
     def _parse_hysteria2_settings(self, inbound: dict) -> dict:
         """Parse Hysteria2 specific settings."""
@@ -150,12 +157,45 @@ class SingBoxConfig(dict):
         """Serialize configuration to JSON string."""
         return json.dumps(self, **kwargs)
 
+    def iter_json(self):
+        """
+        Serialize configuration to JSON in chunks, one per top-level value
+        and one per inbound, producing the same output as to_json().
+        Each chunk is encoded by json.dumps, which keeps the C encoder, so
+        the CPU cost stays close to to_json() while only the largest
+        single inbound is held in memory at once.
+        """
+        yield "{"
+        for i, (key, value) in enumerate(self.items()):
+            if i:
+                yield ", "
+            yield json.dumps(key) + ": "
+            if key == "inbounds" and isinstance(value, list):
+                yield "["
+                for j, inbound in enumerate(value):
+                    if j:
+                        yield ", "
+                    yield json.dumps(inbound)
+                yield "]"
+            else:
+                yield json.dumps(value)
+        yield "}"
+
     def copy(self) -> "SingBoxConfig":
-        """Create a deep copy of the configuration."""
+        """
+        Create a copy of the configuration.
+        Only inbounds are modified by include_db_users, so the rest of the
+        tree and the resolved inbound settings, which are read-only, are
+        shared with the original.
+        """
+        config = dict(self)
+        if "inbounds" in config:
+            config["inbounds"] = deepcopy(config["inbounds"])
+
         return SingBoxConfig(
-            deepcopy(dict(self)),
-            inbounds_by_tag=deepcopy(self.inbounds_by_tag),
-            inbounds_by_protocol=deepcopy(self.inbounds_by_protocol),
+            config,
+            inbounds_by_tag=self.inbounds_by_tag,
+            inbounds_by_protocol=self.inbounds_by_protocol,
         )
 
     def _get_user_proxy_settings(self, user, proxy_type) -> dict:
@@ -170,19 +210,44 @@ class SingBoxConfig(dict):
         Include users from database into the configuration.
         This method is called before starting/reloading sing-box.
         """
+        from sqlalchemy.orm import selectinload
+
         from app.db import GetDB
-        from app.db.models import User
+        from app.db.models import Proxy, User
         from app.models.user import UserStatus
 
         config = self.copy()
 
+        proxy_types = set(PROTOCOL_PROXY_TYPES.values())
+
         with GetDB() as db:
+            # Only load users having a sing-box proxy, along with their
+            # proxies and excluded inbounds needed for user.inbounds
             users = (
                 db.query(User)
                 .filter(User.status.in_([UserStatus.active, UserStatus.on_hold]))
+                .filter(User.proxies.any(Proxy.type.in_(proxy_types)))
+                .options(
+                    selectinload(User.proxies).selectinload(Proxy.excluded_inbounds)
+                )
                 .all()
             )
 
+            # Group users by (proxy type, inbound tag) in a single pass so each
+            # inbound needs one lookup instead of scanning every user
+            users_by_inbound = defaultdict(list)
+            for user in users:
+                for proxy_type, tags in user.inbounds.items():
+                    if proxy_type not in proxy_types:
+                        continue
+
+                    proxy_settings = self._get_user_proxy_settings(user, proxy_type)
+                    if not proxy_settings:
+                        continue
+
+                    for tag in set(tags):
+                        users_by_inbound[(proxy_type, tag)].append((user, proxy_settings))
+
             for inbound in config.get("inbounds", []):
                 tag = inbound.get("tag")
                 protocol = inbound.get("type")
@@ -194,56 +259,36 @@ class SingBoxConfig(dict):
                 if not proxy_type:
                     continue
 
+                inbound_users = users_by_inbound.get((proxy_type, tag), ())
+
                 if protocol == "hysteria2":
-                    inbound["users"] = []
-                    for user in users:
-                        if proxy_type in user.inbounds and tag in user.inbounds.get(
-                            proxy_type, []
-                        ):
-                            proxy_settings = self._get_user_proxy_settings(user, proxy_type)
-                            if proxy_settings:
-                                inbound["users"].append(
-                                    {
-                                        "name": f"{user.id}.{user.username}",
-                                        "password": proxy_settings.get("password", ""),
-                                    }
-                                )
+                    inbound["users"] = [
+                        {
+                            "name": f"{user.id}.{user.username}",
+                            "password": proxy_settings.get("password", ""),
+                        }
+                        for user, proxy_settings in inbound_users
+                    ]
 
                 elif protocol == "tuic":
-                    inbound["users"] = []
-                    for user in users:
-                        if proxy_type in user.inbounds and tag in user.inbounds.get(
-                            proxy_type, []
-                        ):
-                            proxy_settings = self._get_user_proxy_settings(user, proxy_type)
-                            if proxy_settings:
-                                inbound["users"].append(
-                                    {
-                                        "name": f"{user.id}.{user.username}",
-                                        "uuid": str(proxy_settings.get("uuid", "")),
-                                        "password": proxy_settings.get("password", ""),
-                                    }
-                                )
+                    inbound["users"] = [
+                        {
+                            "name": f"{user.id}.{user.username}",
+                            "uuid": str(proxy_settings.get("uuid", "")),
+                            "password": proxy_settings.get("password", ""),
+                        }
+                        for user, proxy_settings in inbound_users
+                    ]
 
                 elif protocol == "wireguard":
-                    inbound["peers"] = []
-                    for user in users:
-                        if proxy_type in user.inbounds and tag in user.inbounds.get(
-                            proxy_type, []
-                        ):
-                            proxy_settings = self._get_user_proxy_settings(user, proxy_type)
-                            if proxy_settings:
-                                inbound["peers"].append(
-                                    {
-                                        "public_key": proxy_settings.get(
-                                            "public_key", ""
-                                        ),
-                                        "allowed_ips": [
-                                            proxy_settings.get(
-                                                "address", "10.0.0.2/32"
-                                            )
-                                        ],
-                                    }
-                                )
+                    inbound["peers"] = [
+                        {
+                            "public_key": proxy_settings.get("public_key", ""),
+                            "allowed_ips": [
+                                proxy_settings.get("address", "10.0.0.2/32")
+                            ],
+                        }
+                        for _, proxy_settings in inbound_users
+                    ]
 
         return config
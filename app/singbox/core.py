@@ -1,16 +1,60 @@
 import atexit
+import hashlib
 import re
+import selectors
 import subprocess
+import tempfile
 import threading
 import signal
 import os
 from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
+from functools import lru_cache
+from typing import Optional
 
 from app import logger
 from app.singbox.config import SingBoxConfig
 from config import DEBUG
 
+# Seconds to wait for `sing-box version` before giving up
+VERSION_TIMEOUT = 2
+
+_VERSION_RE = re.compile(r"sing-box version (\d+\.\d+\.\d+)")
+
+
+@lru_cache(maxsize=1)
+def _probe_version(executable_path: str, mtime: Optional[int]):
+    """
+    Run `sing-box version` and parse the version number.
+    The binary's mtime is part of the cache key so an upgrade is picked up.
+    """
+    try:
+        result = subprocess.run(
+            [executable_path, "version"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            timeout=VERSION_TIMEOUT,
+            check=False,
+        )
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+
+    m = _VERSION_RE.search(result.stdout)
+    if m:
+        return m.group(1)
+
+
+def _dump_config(config: SingBoxConfig, f) -> bytes:
+    """Stream the config as JSON into a binary file, returning its blake2b digest."""
+    config_hash = hashlib.blake2b()
+    for chunk in config.iter_json():
+        data = chunk.encode()
+        config_hash.update(data)
+        f.write(data)
+    return config_hash.digest()
+
 
 class SingBoxCore:
     def __init__(
@@ -24,58 +68,80 @@ class SingBoxCore:
         self.version = self.get_version()
         self.process = None
         self.restarting = False
+        self._capture_thread = None
         self._config_path = None
+        self._config_hash = None
+        self._reload_lock = threading.Lock()
 
         self._logs_buffer = deque(maxlen=100)
         self._temp_log_buffers = {}
         self._on_start_funcs = []
         self._on_stop_funcs = []
         self._env = {"SINGBOX_ASSETS_PATH": assets_path}
+        # Pool workers are not daemon threads; they are joined at interpreter
+        # exit, so a callback still running then delays shutdown
+        self._callback_pool = ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix="singbox-cb"
+        )
 
         atexit.register(lambda: self.stop() if self.started else None)
 
     def get_version(self):
         try:
-            cmd = [self.executable_path, "version"]
-            output = subprocess.check_output(cmd, stderr=subprocess.STDOUT).decode(
-                "utf-8"
-            )
-            m = re.search(r"sing-box version (\d+\.\d+\.\d+)", output)
-            if m:
-                return m.group(1)
-        except (subprocess.CalledProcessError, FileNotFoundError):
-            return None
+            mtime = os.stat(self.executable_path).st_mtime_ns
+        except OSError:
+            mtime = None
+
+        version = _probe_version(self.executable_path, mtime)
+        if version is None:
+            # don't keep a failed probe around, try again next time
+            _probe_version.cache_clear()
+        return version
 
     def __capture_process_logs(self):
-        def capture_and_debug_log():
-            while self.process:
-                output = self.process.stdout.readline()
-                if output:
-                    output = output.strip()
-                    self._logs_buffer.append(output)
-                    for buf in list(self._temp_log_buffers.values()):
-                        buf.append(output)
-                    logger.debug(output)
-
-                elif not self.process or self.process.poll() is not None:
+        def capture(process, debug: bool):
+            fd = process.stdout.fileno()
+            os.set_blocking(fd, False)
+            selector = selectors.DefaultSelector()
+            selector.register(fd, selectors.EVENT_READ)
+            tail = bytearray()
+            while True:
+                selector.select()
+                try:
+                    chunk = os.read(fd, 65536)
+                except BlockingIOError:
+                    continue
+                except OSError:
                     break
 
-        def capture_only():
-            while self.process:
-                output = self.process.stdout.readline()
-                if output:
-                    output = output.strip()
-                    self._logs_buffer.append(output)
-                    for buf in list(self._temp_log_buffers.values()):
-                        buf.append(output)
-
-                elif not self.process or self.process.poll() is not None:
+                if chunk:
+                    tail += chunk
+                    end = tail.rfind(b"\n")
+                    if end < 0:
+                        continue
+                    batch = bytes(tail[:end])
+                    del tail[:end + 1]
+                elif tail:
+                    # process exited, flush the last unterminated line
+                    batch = bytes(tail)
+                    tail.clear()
+                else:
                     break
 
-        if DEBUG:
-            threading.Thread(target=capture_and_debug_log, daemon=True).start()
-        else:
-            threading.Thread(target=capture_only, daemon=True).start()
+                lines = [line.strip() for line in batch.decode("utf-8", "replace").split("\n")]
+                self._logs_buffer.extend(lines)
+                for buf in list(self._temp_log_buffers.values()):
+                    buf.extend(lines)
+                if debug:
+                    for line in lines:
+                        logger.debug(line)
+
+            selector.close()
+
+        self._capture_thread = threading.Thread(
+            target=capture, args=(self.process, DEBUG), daemon=True
+        )
+        self._capture_thread.start()
 
     @contextmanager
     def get_logs(self):
@@ -103,12 +169,9 @@ class SingBoxCore:
             raise RuntimeError("Sing-box is started already")
 
         # Write config to temporary file
-        import tempfile
-        import json
-
         fd, self._config_path = tempfile.mkstemp(suffix=".json", prefix="singbox_")
-        with os.fdopen(fd, "w") as f:
-            f.write(config.to_json())
+        with os.fdopen(fd, "wb") as f:
+            self._config_hash = _dump_config(config, f)
 
         cmd = [self.executable_path, "run", "-c", self._config_path]
 
@@ -118,15 +181,14 @@ class SingBoxCore:
             stdin=subprocess.PIPE,
             stderr=subprocess.STDOUT,
             stdout=subprocess.PIPE,
-            universal_newlines=True,
+            bufsize=0,
         )
         logger.warning(f"Sing-box core {self.version} started")
 
         self.__capture_process_logs()
 
         # execute on start functions
-        for func in self._on_start_funcs:
-            threading.Thread(target=func, daemon=True).start()
+        self._run_callbacks(self._on_start_funcs)
 
     def stop(self):
         if not self.started:
@@ -138,6 +200,11 @@ class SingBoxCore:
         except subprocess.TimeoutExpired:
             self.process.kill()
 
+        # let the capture thread drain what is left in the pipe
+        if self._capture_thread:
+            self._capture_thread.join(timeout=1)
+            self._capture_thread = None
+
         self.process = None
         logger.warning("Sing-box core stopped")
 
@@ -148,10 +215,10 @@ class SingBoxCore:
             except Exception:
                 pass
             self._config_path = None
+        self._config_hash = None
 
         # execute on stop functions
-        for func in self._on_stop_funcs:
-            threading.Thread(target=func, daemon=True).start()
+        self._run_callbacks(self._on_stop_funcs)
 
     def restart(self, config: SingBoxConfig):
         if self.restarting is True:
@@ -165,26 +232,64 @@ class SingBoxCore:
         finally:
             self.restarting = False
 
+    def _write_config(self, config: SingBoxConfig) -> bool:
+        """
+        Replace the config file atomically by writing a temporary file and
+        renaming it, so sing-box never reads a partially written config.
+        Returns False and leaves the file untouched if the config is unchanged.
+        """
+        fd, tmp_path = tempfile.mkstemp(
+            suffix=".tmp", prefix="singbox_", dir=os.path.dirname(self._config_path)
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                config_hash = _dump_config(config, f)
+                if config_hash == self._config_hash:
+                    return False
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self._config_path)
+        finally:
+            # still present if unchanged, or if writing or renaming failed
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+        self._config_hash = config_hash
+        return True
+
     def reload(self, config: SingBoxConfig):
         """Reload configuration by rewriting config file and sending SIGHUP."""
-        if not self.started:
-            return self.start(config)
-
-        # Write new config
-        if self._config_path and os.path.exists(self._config_path):
-            with open(self._config_path, "w") as f:
-                f.write(config.to_json())
+        # Serialize reloads so concurrent callers can't interleave the
+        # config write, the hash update and the SIGHUP
+        with self._reload_lock:
+            if not self.started:
+                return self.start(config)
+
+            # Write new config
+            if self._config_path and os.path.exists(self._config_path):
+                if not self._write_config(config):
+                    logger.debug("Sing-box config unchanged, skipping reload")
+                    return
+
+                # Send SIGHUP to reload config
+                try:
+                    os.kill(self.process.pid, signal.SIGHUP)
+                    logger.info("Sing-box config reloaded via SIGHUP")
+                except Exception as e:
+                    logger.error(f"Failed to reload sing-box config: {e}")
+                    # Fall back to restart
+                    self.restart(config)
+            else:
+                self.restart(config)
 
-            # Send SIGHUP to reload config
+    def _run_callbacks(self, funcs: list):
+        for func in funcs:
             try:
-                os.kill(self.process.pid, signal.SIGHUP)
-                logger.info("Sing-box config reloaded via SIGHUP")
-            except Exception as e:
-                logger.error(f"Failed to reload sing-box config: {e}")
-                # Fall back to restart
-                self.restart(config)
-        else:
-            self.restart(config)
+                self._callback_pool.submit(func)
+            except RuntimeError:
+                # concurrent.futures shuts every pool down before atexit
+                # handlers run, so stop() at exit ends up here
+                threading.Thread(target=func, daemon=True).start()
 
     def on_start(self, func: callable):
         self._on_start_funcs.append(func)
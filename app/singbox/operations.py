@@ -2,43 +2,56 @@
 Sing-box user operations.
 Handles adding, removing, and updating users for Hysteria2, TUIC, and WireGuard protocols.
 """
-from typing import TYPE_CHECKING, List
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional
 
 from app import logger
 from app.models.proxy import ProxyTypes
 
 if TYPE_CHECKING:
     from app.db.models import User as DBUser
-    from app.models.user import UserResponse
 
 
 SINGBOX_PROTOCOLS = {ProxyTypes.Hysteria2, ProxyTypes.TUIC, ProxyTypes.WireGuard}
 
+# Seconds to wait for more user changes before reloading sing-box
+RELOAD_DELAY = 0.5
+
+_reload_lock = threading.Lock()
+_reload_run_lock = threading.Lock()
+_reload_timer: Optional[threading.Timer] = None
+
 
 def is_singbox_protocol(proxy_type: ProxyTypes) -> bool:
     """Check if a protocol is handled by sing-box."""
     return proxy_type in SINGBOX_PROTOCOLS
 
 
+def _get_singbox_inbounds(dbuser: "DBUser") -> Dict[ProxyTypes, List[str]]:
+    """Get the user's inbound tags for sing-box protocols only."""
+    inbounds = dbuser.inbounds
+    return {
+        proxy_type: inbounds[proxy_type]
+        for proxy_type in SINGBOX_PROTOCOLS & inbounds.keys()
+    }
+
+
 def add_user(dbuser: "DBUser"):
     """
     Add a user to sing-box configuration.
     Since sing-box doesn't have a dynamic user API like Xray,
     we need to reload the configuration.
     """
-    from app.models.user import UserResponse
-
-    user = UserResponse.model_validate(dbuser)
-
-    for proxy_type, inbound_tags in user.inbounds.items():
-        if not is_singbox_protocol(proxy_type):
-            continue
+    inbounds = _get_singbox_inbounds(dbuser)
+    if not inbounds:
+        return
 
+    for proxy_type, inbound_tags in inbounds.items():
         if not inbound_tags:
             continue
 
         logger.info(
-            f"User '{user.username}' added to sing-box inbounds: {inbound_tags}"
+            f"User '{dbuser.username}' added to sing-box inbounds: {inbound_tags}"
         )
 
     # Trigger config reload
@@ -48,20 +61,15 @@ def add_user(dbuser: "DBUser"):
 def remove_user(dbuser: "DBUser"):
     """
     Remove a user from sing-box configuration.
+    Always reloads: the user may already have lost their sing-box proxies
+    in the database while still being present in the running config.
     """
-    from app.models.user import UserResponse
-
-    user = UserResponse.model_validate(dbuser)
-
-    for proxy_type, inbound_tags in user.inbounds.items():
-        if not is_singbox_protocol(proxy_type):
-            continue
-
+    for proxy_type, inbound_tags in _get_singbox_inbounds(dbuser).items():
         if not inbound_tags:
             continue
 
         logger.info(
-            f"User '{user.username}' removed from sing-box inbounds: {inbound_tags}"
+            f"User '{dbuser.username}' removed from sing-box inbounds: {inbound_tags}"
         )
 
     # Trigger config reload
@@ -72,14 +80,10 @@ def update_user(dbuser: "DBUser"):
     """
     Update a user in sing-box configuration.
     """
-    from app.models.user import UserResponse
-
-    user = UserResponse.model_validate(dbuser)
+    if not _get_singbox_inbounds(dbuser):
+        return
 
-    for proxy_type in user.inbounds.keys():
-        if is_singbox_protocol(proxy_type):
-            logger.info(f"User '{user.username}' updated in sing-box")
-            break
+    logger.info(f"User '{dbuser.username}' updated in sing-box")
 
     # Trigger config reload
     _reload_singbox()
@@ -87,23 +91,47 @@ def update_user(dbuser: "DBUser"):
 
 def _reload_singbox():
     """
-    Reload sing-box configuration with updated users.
-    This is called after any user change.
+    Schedule a reload of sing-box configuration with updated users.
+    This is called after any user change. Calls made while a reload is
+    pending are coalesced into it, so a burst of changes reloads once.
     """
+    global _reload_timer
     from config import SINGBOX_ENABLED
 
     if not SINGBOX_ENABLED:
         return
 
-    try:
-        from app import singbox
+    with _reload_lock:
+        if _reload_timer is not None:
+            return
 
-        if singbox.core and singbox.core.started:
-            # Generate new config with all users
-            new_config = singbox.config.include_db_users()
-            singbox.core.reload(new_config)
-    except Exception as e:
-        logger.error(f"Failed to reload sing-box: {e}")
+        _reload_timer = threading.Timer(RELOAD_DELAY, _do_reload)
+        _reload_timer.daemon = True
+        _reload_timer.start()
+
+
+def _do_reload():
+    """
+    Reload sing-box configuration with updated users.
+    """
+    global _reload_timer
+
+    # A rebuild can outlast RELOAD_DELAY, so reloads run one at a time
+    with _reload_run_lock:
+        # Release the pending slot first so changes made during the reload
+        # schedule another one instead of being lost
+        with _reload_lock:
+            _reload_timer = None
+
+        try:
+            from app import singbox
+
+            if singbox.core and singbox.core.started:
+                # Generate new config with all users
+                new_config = singbox.config.include_db_users()
+                singbox.core.reload(new_config)
+        except Exception as e:
+            logger.error(f"Failed to reload sing-box: {e}")
 
 
 def get_user_inbounds(
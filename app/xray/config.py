@@ -59,6 +59,7 @@ class XRayConfig(dict):
         self.inbounds_by_tag = {}
         self._fallbacks_inbound = self.get_inbound(XRAY_FALLBACKS_INBOUND_TAG)
         self._resolve_inbounds()
+        self.inbound_tags = frozenset(self.inbounds_by_tag)
 
         self._apply_api()
 